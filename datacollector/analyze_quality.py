@@ -6,6 +6,10 @@ import pymysql
 conn = pymysql.connect(host='localhost', user='kbitboy', password='danieyl', database='hardwizchippy')
 cursor = conn.cursor()
 
+# Resolve the "last 180 records" window once instead of in every query
+cursor.execute('SELECT COALESCE(MAX(id), 0) - 180 FROM cpu_source_data')
+recent_min_id = cursor.fetchone()[0]
+
 print('📊 DATA QUALITY ANALYSIS')
 print('=' * 80)
 
@@ -19,10 +23,10 @@ cursor.execute('''
         COUNT(DISTINCT cpu_id) as unique_cpus,
         ROUND(AVG(raw_data_count), 1) as avg_data_points
     FROM cpu_source_data
-    WHERE id > (SELECT MAX(id) - 180 FROM cpu_source_data)
+    WHERE id > %s
     GROUP BY source
     ORDER BY success_rate DESC
-''')
+''', (recent_min_id,))
 
 print('\n🎯 SOURCE PERFORMANCE (Last 180 records):')
 print(f"{'Source':<20} {'Attempts':<10} {'Success':<10} {'Rate':<10} {'CPUs':<10} {'Avg Data'}")
@@ -40,9 +44,9 @@ cursor.execute('''
         ROUND(AVG(CASE WHEN c.transistors_million IS NOT NULL THEN 1 ELSE 0 END) * 100, 1) as transistor_rate
     FROM cpus c
     JOIN manufacturers m ON c.manufacturer_id = m.id
-    WHERE c.id IN (SELECT DISTINCT cpu_id FROM cpu_source_data WHERE id > (SELECT MAX(id) - 180 FROM cpu_source_data))
+    WHERE c.id IN (SELECT DISTINCT cpu_id FROM cpu_source_data WHERE id > %s)
     GROUP BY m.name
-''')
+''', (recent_min_id,))
 
 print('\n🔬 TRANSISTOR DATA EXTRACTION:')
 print(f"{'Manufacturer':<15} {'Total CPUs':<12} {'With Data':<12} {'Rate'}")
@@ -59,10 +63,10 @@ cursor.execute('''
         c.transistors_million,
         (SELECT COUNT(DISTINCT source) FROM cpu_source_data WHERE cpu_id = c.id AND success = 1) as sources_count
     FROM cpus c
-    WHERE c.id IN (SELECT DISTINCT cpu_id FROM cpu_source_data WHERE id > (SELECT MAX(id) - 180 FROM cpu_source_data))
+    WHERE c.id IN (SELECT DISTINCT cpu_id FROM cpu_source_data WHERE id > %s)
     ORDER BY sources_count DESC
     LIMIT 5
-''')
+''', (recent_min_id,))
 
 print('\n🏆 TOP 5 CPUs BY SOURCE COVERAGE:')
 print(f"{'CPU Name':<35} {'Sources':<10} {'Cores':<8} {'Transistors'}")
@@ -82,8 +86,8 @@ cursor.execute('''
         SUM(CASE WHEN c.tdp IS NOT NULL THEN 1 ELSE 0 END) as with_tdp,
         SUM(CASE WHEN c.process_node IS NOT NULL THEN 1 ELSE 0 END) as with_process
     FROM cpus c
-    WHERE c.id IN (SELECT DISTINCT cpu_id FROM cpu_source_data WHERE id > (SELECT MAX(id) - 180 FROM cpu_source_data))
-''')
+    WHERE c.id IN (SELECT DISTINCT cpu_id FROM cpu_source_data WHERE id > %s)
+''', (recent_min_id,))
 
 row = cursor.fetchone()
 total = row[0]
@@ -102,12 +106,12 @@ cursor.execute('''
         SUM(success) as successful_sources
     FROM cpus c
     JOIN cpu_source_data csd ON c.id = csd.cpu_id
-    WHERE c.id IN (SELECT DISTINCT cpu_id FROM cpu_source_data WHERE id > (SELECT MAX(id) - 180 FROM cpu_source_data))
+    WHERE c.id IN (SELECT DISTINCT cpu_id FROM cpu_source_data WHERE id > %s)
     GROUP BY c.id, c.name
     HAVING successful_sources < 2
     ORDER BY successful_sources ASC
     LIMIT 5
-''')
+''', (recent_min_id,))
 
 print('\n⚠️ MOST PROBLEMATIC CPUs (< 2 sources successful):')
 print(f"{'CPU Name':<35} {'Attempts':<12} {'Successful'}")
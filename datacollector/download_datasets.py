@@ -2,9 +2,12 @@
 Download CPU datasets from various sources.
 Run this first to fetch all data sources.
 """
+import gzip
+import urllib.error
 import urllib.request
 import os
 import json
+import shutil
 
 # Create data directory
 os.makedirs('data_sources', exist_ok=True)
@@ -16,12 +19,35 @@ print("=" * 80)
 # Download GitHub CPU Specs JSON
 print("\n1️⃣ Downloading GitHub CPU Specs JSON...")
 github_url = "https://raw.githubusercontent.com/LiamOsler/CPU-Specs-Website/master/data/specs/combined.json"
+github_path = 'data_sources/github_cpu_specs.json'
+etag_path = github_path + '.etag'
 try:
-    urllib.request.urlretrieve(github_url, 'data_sources/github_cpu_specs.json')
-    print("✅ Downloaded: github_cpu_specs.json")
+    # Send the ETag of the last download so an unchanged file isn't re-fetched
+    request = urllib.request.Request(github_url, headers={'Accept-Encoding': 'gzip'})
+    if os.path.exists(github_path) and os.path.exists(etag_path):
+        with open(etag_path, 'r', encoding='utf-8') as f:
+            request.add_header('If-None-Match', f.read().strip())
+    
+    try:
+        with urllib.request.urlopen(request) as response, open(github_path + '.part', 'wb') as f:
+            # urllib doesn't decode compressed bodies itself
+            if response.headers.get('Content-Encoding') == 'gzip':
+                shutil.copyfileobj(gzip.GzipFile(fileobj=response), f)
+            else:
+                shutil.copyfileobj(response, f)
+            etag = response.headers.get('ETag')
+        os.replace(github_path + '.part', github_path)
+        if etag:
+            with open(etag_path, 'w', encoding='utf-8') as f:
+                f.write(etag)
+        print("✅ Downloaded: github_cpu_specs.json")
+    except urllib.error.HTTPError as e:
+        if e.code != 304:
+            raise
+        print("✅ Up to date: github_cpu_specs.json (not modified)")
     
     # Check file
-    with open('data_sources/github_cpu_specs.json', 'r', encoding='utf-8') as f:
+    with open(github_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
         print(f"   📊 Contains {len(data)} CPUs")
 except Exception as e:
@@ -3,6 +3,7 @@ Manual Kaggle dataset downloader using direct URLs.
 """
 import urllib.request
 import os
+import shutil
 import zipfile
 
 def download_file(url, filename):
@@ -15,13 +16,13 @@ def download_file(url, filename):
         }
         req = urllib.request.Request(url, headers=headers)
         
-        with urllib.request.urlopen(req) as response:
-            content = response.read()
-            
-        with open(filename, 'wb') as f:
-            f.write(content)
+        # Stream to disk instead of holding the whole archive in memory; the
+        # .part file keeps a failed download from leaving a truncated archive
+        with urllib.request.urlopen(req) as response, open(filename + '.part', 'wb') as f:
+            shutil.copyfileobj(response, f)
+        os.replace(filename + '.part', filename)
         
-        size = len(content) / (1024 * 1024)
+        size = os.path.getsize(filename) / (1024 * 1024)
         print(f"✅ Downloaded {filename} ({size:.1f} MB)")
         return True
     except Exception as e:
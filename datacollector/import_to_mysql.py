@@ -2,6 +2,7 @@
 Import scraped CPU data into MySQL database.
 """
 import json
+import re
 import pymysql
 from datetime import datetime
 
@@ -14,17 +15,93 @@ DB_CONFIG = {
     'charset': 'utf8mb4'
 }
 
-def get_manufacturer_id(cursor, cpu_name):
+# Print progress every N imported CPUs instead of one line per CPU
+PROGRESS_INTERVAL = 100
+
+# Substrings that mark scraped text as HTML/JavaScript debris
+CORRUPTED_MARKERS = ('<script', 'function(', '\\x', 'data-jc')
+
+# A re-import replaces a CPU's earlier source rows so fresh scrapes win
+RAW_DATA_DELETE_SQL = """
+    DELETE r FROM cpu_raw_data r
+    JOIN cpu_source_data s ON r.source_data_id = s.id
+    WHERE s.cpu_id = %s
+"""
+
+SOURCE_DATA_DELETE_SQL = "DELETE FROM cpu_source_data WHERE cpu_id = %s"
+
+RAW_DATA_INSERT_SQL = """
+    INSERT INTO cpu_raw_data (source_data_id, data_key, data_value)
+    VALUES (%s, %s, %s)
+"""
+
+# Word-level match for AMD product lines; every other name is filed under Intel
+AMD_NAME_PATTERN = re.compile(r'\b(amd|ryzen|threadripper|athlon|epyc|phenom|opteron)\b', re.IGNORECASE)
+
+
+def load_manufacturer_ids(cursor):
+    """Fetch the manufacturer name -> ID map once per import."""
+    cursor.execute("SELECT id, name FROM manufacturers")
+    return {name: manufacturer_id for manufacturer_id, name in cursor.fetchall()}
+
+
+def get_manufacturer_id(manufacturer_ids, cpu_name):
     """Determine manufacturer ID from CPU name."""
-    if 'intel' in cpu_name.lower():
-        cursor.execute("SELECT id FROM manufacturers WHERE name = 'Intel'")
-        result = cursor.fetchone()
-        return result[0] if result else 1  # Default to 1 for Intel
-    elif 'amd' in cpu_name.lower() or 'ryzen' in cpu_name.lower():
-        cursor.execute("SELECT id FROM manufacturers WHERE name = 'AMD'")
-        result = cursor.fetchone()
-        return result[0] if result else 2  # Default to 2 for AMD
-    return 1  # Default to Intel
+    if AMD_NAME_PATTERN.search(cpu_name):
+        return manufacturer_ids.get('AMD', 2)  # Default to 2 for AMD
+    return manufacturer_ids.get('Intel', 1)  # Default to Intel
+
+
+def safe_float(value):
+    """Convert to float, return None if invalid."""
+    if value is None:
+        return None
+    try:
+        result = float(value)
+        # Sanity check: reject unreasonable values
+        if result < 0 or result > 100000:
+            return None
+        return result
+    except (ValueError, TypeError):
+        return None
+
+
+def safe_int(value):
+    """Convert to int, return None if invalid."""
+    if value is None:
+        return None
+    try:
+        result = int(value)
+        if result < 0 or result > 10000:
+            return None
+        return result
+    except (ValueError, TypeError):
+        return None
+
+
+def safe_string(value, max_length=500):
+    """Truncate string to max length."""
+    if value is None:
+        return None
+    str_val = str(value)
+    # Remove obviously corrupted data (contains HTML/JavaScript)
+    str_lower = str_val.lower()
+    if any(marker in str_lower for marker in CORRUPTED_MARKERS):
+        return None
+    return str_val[:max_length]
+
+
+# cpus column -> (field name in the scraped source data, validator)
+BEST_SPEC_FIELDS = {
+    'transistors_million': ('transistors_million', safe_float),
+    'die_size_mm2': ('die_size_mm2', safe_float),
+    'cores': ('cores', safe_int),
+    'threads': ('threads', safe_int),
+    'base_clock': ('base_clock_ghz', safe_float),
+    'boost_clock': ('boost_clock_ghz', safe_float),
+    'tdp': ('tdp', safe_int),
+    'process_node': ('process_node', safe_string),
+}
 
 
 def create_tables(cursor):
@@ -40,6 +117,12 @@ def create_tables(cursor):
     print("✅ Tables verified")
 
 
+def load_imported_cpu_ids(cursor):
+    """Fetch the IDs of CPUs that already have source rows."""
+    cursor.execute("SELECT DISTINCT cpu_id FROM cpu_source_data")
+    return {cpu_id for (cpu_id,) in cursor.fetchall()}
+
+
 def import_data(cursor, json_file='direct_scrape_results.json'):
     """Import CPU data from JSON file."""
     
@@ -48,14 +131,17 @@ def import_data(cursor, json_file='direct_scrape_results.json'):
     
     print(f"📊 Loading {len(data['cpus'])} CPUs...")
     
+    manufacturer_ids = load_manufacturer_ids(cursor)
+    imported_cpu_ids = load_imported_cpu_ids(cursor)
     imported_count = 0
     skipped_count = 0
+    replaced_count = 0
     
     for cpu in data['cpus']:
         cpu_name = cpu['name']
         
         try:
-            manufacturer_id = get_manufacturer_id(cursor, cpu_name)
+            manufacturer_id = get_manufacturer_id(manufacturer_ids, cpu_name)
             
             # Insert CPU (or get existing) using existing schema
             cursor.execute("""
@@ -68,58 +154,19 @@ def import_data(cursor, json_file='direct_scrape_results.json'):
                 cursor.execute("SELECT id FROM cpus WHERE name = %s", (cpu_name,))
                 cpu_id = cursor.fetchone()[0]
             
+            # Drop rows from an earlier import instead of duplicating them
+            if cpu_id in imported_cpu_ids:
+                cursor.execute(RAW_DATA_DELETE_SQL, (cpu_id,))
+                cursor.execute(SOURCE_DATA_DELETE_SQL, (cpu_id,))
+                replaced_count += 1
+            
             # Aggregate best data from all sources
-            best_specs = {
-                'transistors_million': None,
-                'die_size_mm2': None,
-                'cores': None,
-                'threads': None,
-                'base_clock': None,
-                'boost_clock': None,
-                'tdp': None,
-                'process_node': None
-            }
+            best_specs = dict.fromkeys(BEST_SPEC_FIELDS)
             
             # Process each source
             for source in cpu['sources']:
                 # Insert source data (handle None values properly)
                 try:
-                    # Validate numeric fields to prevent corrupted data
-                    def safe_float(value):
-                        """Convert to float, return None if invalid."""
-                        if value is None:
-                            return None
-                        try:
-                            result = float(value)
-                            # Sanity check: reject unreasonable values
-                            if result < 0 or result > 100000:
-                                return None
-                            return result
-                        except (ValueError, TypeError):
-                            return None
-                    
-                    def safe_int(value):
-                        """Convert to int, return None if invalid."""
-                        if value is None:
-                            return None
-                        try:
-                            result = int(value)
-                            if result < 0 or result > 10000:
-                                return None
-                            return result
-                        except (ValueError, TypeError):
-                            return None
-                    
-                    def safe_string(value, max_length=500):
-                        """Truncate string to max length."""
-                        if value is None:
-                            return None
-                        str_val = str(value)
-                        # Remove obviously corrupted data (contains HTML/JavaScript)
-                        if any(x in str_val.lower() for x in ['<script', 'function(', '\\x', 'data-jc']):
-                            return None
-                        return str_val[:max_length]
-                    
                     cursor.execute("""
                         INSERT INTO cpu_source_data 
                         (cpu_id, source, url, success, transistors_million, die_size_mm2, 
@@ -143,22 +190,29 @@ def import_data(cursor, json_file='direct_scrape_results.json'):
                     
                     source_data_id = cursor.lastrowid
                     
-                    # Insert raw data key-value pairs
+                    # Insert raw data key-value pairs in one batch
                     if source.get('raw_data'):
-                        for key, value in source['raw_data'].items():
-                            try:
-                                cursor.execute("""
-                                    INSERT INTO cpu_raw_data (source_data_id, data_key, data_value)
-                                    VALUES (%s, %s, %s)
-                                """, (source_data_id, key, str(value)[:500]))  # Limit value length
-                            except Exception as e:
-                                # Skip problematic raw data entries
-                                continue
+                        raw_rows = [
+                            (source_data_id, key, str(value)[:500])  # Limit value length
+                            for key, value in source['raw_data'].items()
+                        ]
+                        # executemany may split into several statements; the
+                        # savepoint undoes any that succeeded before retrying
+                        cursor.execute("SAVEPOINT raw_data_batch")
+                        try:
+                            cursor.executemany(RAW_DATA_INSERT_SQL, raw_rows)
+                        except pymysql.Error:
+                            cursor.execute("ROLLBACK TO SAVEPOINT raw_data_batch")
+                            # Retry row by row, skipping problematic raw data entries
+                            for raw_row in raw_rows:
+                                try:
+                                    cursor.execute(RAW_DATA_INSERT_SQL, raw_row)
+                                except Exception:
+                                    continue
                     
                     # Update best specs (prefer non-null values)
                     if source['success']:
-                        for field in best_specs:
-                            source_field = field.replace('_clock', '_clock_ghz')  # Map to source format
+                        for field, (source_field, _) in BEST_SPEC_FIELDS.items():
                             if source.get(source_field) is not None:
                                 best_specs[field] = source[source_field]
                 
@@ -170,46 +224,12 @@ def import_data(cursor, json_file='direct_scrape_results.json'):
             update_fields = []
             update_values = []
             
-            if best_specs['transistors_million'] is not None:
-                validated = safe_float(best_specs['transistors_million'])
-                if validated is not None:
-                    update_fields.append('transistors_million = %s')
-                    update_values.append(validated)
-            if best_specs['die_size_mm2'] is not None:
-                validated = safe_float(best_specs['die_size_mm2'])
-                if validated is not None:
-                    update_fields.append('die_size_mm2 = %s')
-                    update_values.append(validated)
-            if best_specs['cores'] is not None:
-                validated = safe_int(best_specs['cores'])
-                if validated is not None:
-                    update_fields.append('cores = %s')
-                    update_values.append(validated)
-            if best_specs['threads'] is not None:
-                validated = safe_int(best_specs['threads'])
-                if validated is not None:
-                    update_fields.append('threads = %s')
-                    update_values.append(validated)
-            if best_specs['base_clock'] is not None:
-                validated = safe_float(best_specs['base_clock'])
-                if validated is not None:
-                    update_fields.append('base_clock = %s')
-                    update_values.append(validated)
-            if best_specs['boost_clock'] is not None:
-                validated = safe_float(best_specs['boost_clock'])
-                if validated is not None:
-                    update_fields.append('boost_clock = %s')
-                    update_values.append(validated)
-            if best_specs['tdp'] is not None:
-                validated = safe_int(best_specs['tdp'])
-                if validated is not None:
-                    update_fields.append('tdp = %s')
-                    update_values.append(validated)
-            if best_specs['process_node'] is not None:
-                validated = safe_string(best_specs['process_node'], 500)
-                if validated is not None:
-                    update_fields.append('process_node = %s')
-                    update_values.append(validated)
+            for field, (_, validate) in BEST_SPEC_FIELDS.items():
+                if best_specs[field] is not None:
+                    validated = validate(best_specs[field])
+                    if validated is not None:
+                        update_fields.append(f'{field} = %s')
+                        update_values.append(validated)
             
             if update_fields:
                 update_values.append(cpu_id)
@@ -219,7 +239,8 @@ def import_data(cursor, json_file='direct_scrape_results.json'):
                 """, tuple(update_values))
             
             imported_count += 1
-            print(f"  ✅ {cpu_name}")
+            if imported_count % PROGRESS_INTERVAL == 0:
+                print(f"  ✅ Imported {imported_count}/{len(data['cpus'])} CPUs...")
             
         except Exception as e:
             print(f"  ❌ {cpu_name}: {e}")
@@ -228,21 +249,20 @@ def import_data(cursor, json_file='direct_scrape_results.json'):
     print(f"\n📊 Import complete:")
     print(f"  ✅ Imported: {imported_count}")
     print(f"  ❌ Skipped: {skipped_count}")
+    print(f"  🔄 Replaced earlier source data: {replaced_count}")
 
 
 def show_stats(cursor):
     """Show database statistics."""
-    cursor.execute("SELECT COUNT(*) FROM cpus")
-    cpu_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM cpus WHERE cores IS NOT NULL")
-    specs_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM cpu_source_data WHERE success = TRUE")
-    success_count = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM cpu_raw_data")
-    raw_count = cursor.fetchone()[0]
+    # All counters in a single round trip
+    cursor.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM cpus),
+            (SELECT COUNT(cores) FROM cpus),
+            (SELECT COUNT(*) FROM cpu_source_data WHERE success = TRUE),
+            (SELECT COUNT(*) FROM cpu_raw_data)
+    """)
+    cpu_count, specs_count, success_count, raw_count = cursor.fetchone()
     
     # Show sample CPU
     cursor.execute("""
@@ -270,6 +290,7 @@ def main():
     """Main import process."""
     print("🔌 Connecting to MySQL...")
     
+    connection = None
     try:
         connection = pymysql.connect(**DB_CONFIG)
         cursor = connection.cursor()
@@ -288,7 +309,6 @@ def main():
         show_stats(cursor)
         
         cursor.close()
-        connection.close()
         
         print("\n✅ Import completed successfully!")
         
@@ -296,6 +316,10 @@ def main():
         print(f"❌ Database error: {e}")
     except Exception as e:
         print(f"❌ Error: {e}")
+    finally:
+        # Close even when the import fails part-way
+        if connection is not None:
+            connection.close()
 
 
 if __name__ == '__main__':
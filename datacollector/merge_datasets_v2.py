@@ -4,20 +4,99 @@ Simplified CPU dataset merger - v2
 import pandas as pd
 import json
 import pymysql
-from fuzzywuzzy import fuzz
 import re
 
+# Word-level match for AMD product lines when the manufacturer column is empty
+AMD_NAME_PATTERN = re.compile(r'\b(amd|ryzen|threadripper|athlon|epyc|phenom|opteron)\b', re.IGNORECASE)
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Vendor label set by load_spec_dataset -> fallback manufacturers.id, used
+# when the manufacturers table has no row for the vendor
+MANUFACTURER_IDS = {
+    'Intel': 1,
+    'AMD': 2,
+}
+
+# Substrings that identify the CPU name column in the vendor spec CSVs
+NAME_COLUMN_HINTS = ('model', 'name', 'product')
+
+# Vendor spec CSV column -> merged dataset column
+SPEC_COLUMN_ALIASES = {
+    'numCores': 'cores',
+    'numThreads': 'threads',
+    'defaultTDP': 'tdp',
+    # The Intel CSV's headers are swapped: 'cache' holds the TDP in watts and
+    # 'TDP' holds the cache size in MB
+    'cache': 'tdp',
+}
+
+# Merged dataset column -> benchmarks.id
+BENCHMARK_COLUMNS = {
+    'passmark_multi': 6,
+    'passmark_single': 5,
+    'cinebench_multi': 2,
+    'cinebench_single': 1,
+}
+
+CPU_UPSERT_SQL = """
+    INSERT INTO cpus (name, manufacturer_id, cores, threads, tdp)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        cores = COALESCE(VALUES(cores), cores),
+        threads = COALESCE(VALUES(threads), threads),
+        tdp = COALESCE(VALUES(tdp), tdp)
+"""
+
+BENCHMARK_UPSERT_SQL = """
+    INSERT INTO cpu_benchmarks (cpu_id, benchmark_id, score, source)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE score = VALUES(score)
+"""
+
 def normalize_cpu_name(name):
     """Normalize CPU names for matching."""
     if not name or pd.isna(name):
         return ""
     name = str(name).lower().strip()
-    name = re.sub(r'\s+', ' ', name)
+    name = WHITESPACE_PATTERN.sub(' ', name)
     name = name.replace('processor', '').replace('cpu', '')
     name = name.replace('(tm)', '').replace('™', '')
     name = name.strip()
     return name
 
+def cpu_name_key(name):
+    """Key CPU names the way MySQL's case-insensitive name index compares them."""
+    return name.casefold().rstrip()
+
+def find_name_column(columns):
+    """Return the first column that looks like a CPU name column."""
+    for col in columns:
+        col_lower = col.lower()
+        if any(hint in col_lower for hint in NAME_COLUMN_HINTS):
+            return col
+    return None
+
+def load_spec_dataset(path, manufacturer):
+    """Load a vendor spec CSV with its columns renamed to the merged names."""
+    df = pd.read_csv(path)
+    print(f"   Columns: {list(df.columns)[:5]}...")
+    name_col = find_name_column(df.columns)
+    if not name_col:
+        print(f"⚠️ No name column found")
+        return pd.DataFrame()
+    df = df.rename(columns={name_col: 'name', **SPEC_COLUMN_ALIASES})
+    # Repeated model rows would fan out in the outer merges and be imported twice
+    df = df.drop_duplicates(subset='name')
+    df['manufacturer'] = manufacturer
+    print(f"✅ {len(df)} {manufacturer} CPUs")
+    return df
+
+def load_manufacturer_ids(cursor):
+    """Fetch the manufacturer name -> ID map once per import."""
+    cursor.execute("SELECT id, name FROM manufacturers")
+    return {**MANUFACTURER_IDS, **{name: manufacturer_id for manufacturer_id, name in cursor.fetchall()}}
+
 def main():
     print("=" * 80)
     print("🔄 CPU DATASET MERGER v2")
@@ -25,52 +104,25 @@ def main():
     
     # Load PassMark benchmarks
     print("\n📖 Loading PassMark benchmarks...")
-    df_passmark = pd.read_csv('data_sources/CPU_benchmark_v4.csv')
-    df_passmark = df_passmark[['cpuName', 'cpuMark', 'threadMark', 'TDP', 'cores', 'socket']].copy()
+    passmark_cols = ['cpuName', 'cpuMark', 'threadMark', 'TDP', 'cores', 'socket']
+    df_passmark = pd.read_csv('data_sources/CPU_benchmark_v4.csv', usecols=passmark_cols)[passmark_cols]
     df_passmark.columns = ['name', 'passmark_multi', 'passmark_single', 'tdp', 'cores', 'socket']
     print(f"✅ {len(df_passmark)} CPUs")
     
     # Load Cinebench R23
     print("\n📖 Loading Cinebench R23...")
-    df_cinebench = pd.read_csv('data_sources/CPU_r23_v2.csv')
-    df_cinebench = df_cinebench[['cpuName', 'singleScore', 'multiScore', 'cores']].copy()
+    cinebench_cols = ['cpuName', 'singleScore', 'multiScore', 'cores']
+    df_cinebench = pd.read_csv('data_sources/CPU_r23_v2.csv', usecols=cinebench_cols)[cinebench_cols]
     df_cinebench.columns = ['name', 'cinebench_single', 'cinebench_multi', 'cores']
     print(f"✅ {len(df_cinebench)} CPUs")
     
     # Load AMD specs
     print("\n📖 Loading AMD specs...")
-    df_amd = pd.read_csv('data_sources/AMDfullspecs_adjusted.csv')
-    print(f"   Columns: {list(df_amd.columns)[:5]}...")
-    # Find name column
-    name_col = None
-    for col in df_amd.columns:
-        if 'model' in col.lower() or 'name' in col.lower():
-            name_col = col
-            break
-    if name_col:
-        df_amd = df_amd.rename(columns={name_col: 'name'})
-        df_amd['manufacturer'] = 'AMD'
-        print(f"✅ {len(df_amd)} AMD CPUs")
-    else:
-        print(f"⚠️ No name column found")
-        df_amd = pd.DataFrame()
+    df_amd = load_spec_dataset('data_sources/AMDfullspecs_adjusted.csv', 'AMD')
     
     # Load Intel specs
     print("\n📖 Loading Intel specs...")
-    df_intel = pd.read_csv('data_sources/INTELpartialspecs_adjusted.csv')
-    print(f"   Columns: {list(df_intel.columns)[:5]}...")
-    name_col = None
-    for col in df_intel.columns:
-        if 'model' in col.lower() or 'name' in col.lower() or 'product' in col.lower():
-            name_col = col
-            break
-    if name_col:
-        df_intel = df_intel.rename(columns={name_col: 'name'})
-        df_intel['manufacturer'] = 'Intel'
-        print(f"✅ {len(df_intel)} Intel CPUs")
-    else:
-        print(f"⚠️ No name column found")
-        df_intel = pd.DataFrame()
+    df_intel = load_spec_dataset('data_sources/INTELpartialspecs_adjusted.csv', 'Intel')
     
     # Merge benchmarks first
     print("\n🔗 Merging benchmarks...")
@@ -127,6 +179,7 @@ def main():
     
     # Import to MySQL
     print("\n📤 Importing to MySQL...")
+    conn = None
     try:
         conn = pymysql.connect(
             host='localhost',
@@ -137,94 +190,93 @@ def main():
         )
         cursor = conn.cursor()
         
-        imported = 0
-        updated = 0
+        # Preload existing names so new/updated counts need no per-row query
+        cursor.execute("SELECT name FROM cpus")
+        existing_names = {cpu_name_key(name) for (name,) in cursor.fetchall()}
+        
+        manufacturer_ids = load_manufacturer_ids(cursor)
+        
         errors = 0
-        batch_size = 100
+        progress_interval = 1000
+        cpu_rows = []
+        scores = []  # (name, benchmark_id, score), resolved to CPU IDs after the upsert
         
-        for idx, row in df.iterrows():
+        # Plain dicts are much cheaper to read per field than iterrows() Series
+        for idx, row in enumerate(df.to_dict('records')):
             try:
-                # Determine manufacturer
-                manufacturer_id = 1  # Default Intel
-                if pd.notna(row.get('manufacturer')):
-                    if 'amd' in str(row['manufacturer']).lower():
-                        manufacturer_id = 2
-                elif pd.notna(row.get('name')):
-                    name_lower = str(row['name']).lower()
-                    if 'ryzen' in name_lower or 'threadripper' in name_lower or 'epyc' in name_lower:
-                        manufacturer_id = 2
+                # Determine manufacturer; benchmark-only rows have no label
+                manufacturer = row.get('manufacturer')
+                if pd.isna(manufacturer):
+                    is_amd = pd.notna(row.get('name')) and AMD_NAME_PATTERN.search(str(row['name']))
+                    manufacturer = 'AMD' if is_amd else 'Intel'
+                manufacturer_id = manufacturer_ids.get(manufacturer, manufacturer_ids['Intel'])
                 
-                # Insert/update CPU
-                cursor.execute("""
-                    INSERT INTO cpus (name, manufacturer_id, cores, threads, tdp)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                        cores = COALESCE(VALUES(cores), cores),
-                        threads = COALESCE(VALUES(threads), threads),
-                        tdp = COALESCE(VALUES(tdp), tdp),
-                        id = LAST_INSERT_ID(id)
-                """, (
-                    str(row['name'])[:150] if pd.notna(row.get('name')) else None,
+                if pd.isna(row.get('name')):
+                    raise ValueError("missing CPU name")
+                name = str(row['name'])[:150]
+                cpu_rows.append((
+                    name,
                     manufacturer_id,
                     int(row['cores']) if pd.notna(row.get('cores')) else None,
                     int(row['threads']) if pd.notna(row.get('threads')) else None,
                     int(row['tdp']) if pd.notna(row.get('tdp')) else None
                 ))
                 
-                cpu_id = cursor.lastrowid
-                if cpu_id == 0:
-                    cursor.execute("SELECT id FROM cpus WHERE name = %s", (row['name'],))
-                    result = cursor.fetchone()
-                    if result:
-                        cpu_id = result[0]
-                        updated += 1
-                    else:
-                        continue
-                else:
-                    imported += 1
-                
-                # Insert PassMark (benchmark_id: 6=Multi, 5=Single)
-                if pd.notna(row.get('passmark_multi')):
-                    cursor.execute("""
-                        INSERT INTO cpu_benchmarks (cpu_id, benchmark_id, score, source)
-                        VALUES (%s, 6, %s, 'kaggle')
-                        ON DUPLICATE KEY UPDATE score = VALUES(score)
-                    """, (cpu_id, float(row['passmark_multi'])))
-                
-                if pd.notna(row.get('passmark_single')):
-                    cursor.execute("""
-                        INSERT INTO cpu_benchmarks (cpu_id, benchmark_id, score, source)
-                        VALUES (%s, 5, %s, 'kaggle')
-                        ON DUPLICATE KEY UPDATE score = VALUES(score)
-                    """, (cpu_id, float(row['passmark_single'])))
+                for column, benchmark_id in BENCHMARK_COLUMNS.items():
+                    if pd.notna(row.get(column)):
+                        scores.append((name, benchmark_id, float(row[column])))
                 
-                # Insert Cinebench R23 (benchmark_id: 2=Multi, 1=Single)
-                if pd.notna(row.get('cinebench_multi')):
-                    cursor.execute("""
-                        INSERT INTO cpu_benchmarks (cpu_id, benchmark_id, score, source)
-                        VALUES (%s, 2, %s, 'kaggle')
-                        ON DUPLICATE KEY UPDATE score = VALUES(score)
-                    """, (cpu_id, float(row['cinebench_multi'])))
-                
-                if pd.notna(row.get('cinebench_single')):
-                    cursor.execute("""
-                        INSERT INTO cpu_benchmarks (cpu_id, benchmark_id, score, source)
-                        VALUES (%s, 1, %s, 'kaggle')
-                        ON DUPLICATE KEY UPDATE score = VALUES(score)
-                    """, (cpu_id, float(row['cinebench_single'])))
-                
-                # Commit in batches for better performance
-                if (idx + 1) % batch_size == 0:
-                    conn.commit()
-                    print(f"  ✅ Imported {idx + 1}/{len(df)} CPUs...")
+                if (idx + 1) % progress_interval == 0:
+                    print(f"  ✅ Prepared {idx + 1}/{len(df)} CPUs...")
                     
             except Exception as e:
                 errors += 1
                 if errors <= 5:  # Only show first 5 errors
                     print(f"  ⚠️ Error on row {idx}: {str(e)[:100]}")
         
+        # Upsert all CPUs in one transaction; pymysql rewrites executemany
+        # into multi-row INSERT statements
+        print(f"  📊 Writing {len(cpu_rows)} CPUs...")
+        try:
+            cursor.executemany(CPU_UPSERT_SQL, cpu_rows)
+        except pymysql.Error:
+            # The upsert is idempotent, so retry row by row to isolate bad rows
+            for cpu_row in cpu_rows:
+                try:
+                    cursor.execute(CPU_UPSERT_SQL, cpu_row)
+                except pymysql.Error as e:
+                    errors += 1
+                    if errors <= 5:
+                        print(f"  ⚠️ Error on CPU {cpu_row[0]}: {str(e)[:100]}")
+        
+        # Resolve every CPU ID with a single query
+        cursor.execute("SELECT name, id FROM cpus")
+        cpu_ids = {cpu_name_key(name): cpu_id for name, cpu_id in cursor.fetchall()}
+        
+        written_names = {cpu_name_key(cpu_row[0]) for cpu_row in cpu_rows}.intersection(cpu_ids)
+        imported = len(written_names - existing_names)
+        updated = len(written_names & existing_names)
+        
+        benchmark_rows = [
+            (cpu_ids[cpu_name_key(name)], benchmark_id, score, 'kaggle')
+            for name, benchmark_id, score in scores
+            if cpu_name_key(name) in cpu_ids
+        ]
+        if benchmark_rows:
+            print(f"  📊 Writing {len(benchmark_rows)} benchmark scores...")
+            try:
+                cursor.executemany(BENCHMARK_UPSERT_SQL, benchmark_rows)
+            except pymysql.Error:
+                # Same idempotent row-by-row retry as the CPU upsert
+                for benchmark_row in benchmark_rows:
+                    try:
+                        cursor.execute(BENCHMARK_UPSERT_SQL, benchmark_row)
+                    except pymysql.Error as e:
+                        errors += 1
+                        if errors <= 5:
+                            print(f"  ⚠️ Error on benchmark for CPU {benchmark_row[0]}: {str(e)[:100]}")
+
         conn.commit()
-        conn.close()
         
         print(f"\n✅ Import complete!")
         print(f"   New CPUs: {imported}")
@@ -235,6 +287,10 @@ def main():
         print(f"❌ MySQL error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        # Close even when the import fails part-way
+        if conn is not None:
+            conn.close()
     
     # Summary
     print("\n" + "=" * 80)